@@ -1,13 +1,92 @@
+import csv
+import hashlib
+import io
 import json
+import os
+import numpy as np
 import pandas as pd
 import PyPDF2
 import re
+import tempfile
 from datetime import datetime
+from pathlib import Path
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz  # PyMuPDF < 1.24
+    except ImportError:
+        fitz = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import re2  # google-re2, linear-time matching
+except ImportError:
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+# CSV files larger than this are streamed row by row instead of loaded into pandas
+STREAM_CSV_THRESHOLD = 256 * 1024 * 1024
+
+# Cell values pandas reads as missing by default; the pyarrow and streaming readers
+# treat them the same way
+CSV_NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+# PDFs up to this size are read into memory before PyPDF2 parses them
+IN_MEMORY_PDF_LIMIT = 200 * 1024 * 1024
+
+# Characters lowercased at a time when prescanning text for biomarker keywords
+KEYWORD_SCAN_WINDOW = 64 * 1024
+
+# PyPDF2 pages are extracted in a process pool once a PDF has this many pages
+PARALLEL_PAGE_THRESHOLD = 8
+
+# Part of every cache key; bump when extraction changes so stale results are ignored
+EXTRACTOR_VERSION = 1
+
+_worker_reader = None
+
+def _init_page_worker(pdf_path):
+    """Open the PDF once in each worker process"""
+    global _worker_reader
+    with open(pdf_path, 'rb') as f:
+        _worker_reader = PyPDF2.PdfReader(io.BytesIO(f.read()))
+
+def _extract_page_text(index):
+    """Extract the text of a single page in a worker process"""
+    return _worker_reader.pages[index].extract_text() or ""
 
 class BiomarkerExtractor:
-    def __init__(self):
-        self.biomarker_patterns = {
+    def __init__(self, cache_dir=None, output_format='aos'):
+        # Directory for results cached by file content hash (disabled when None)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        # 'aos': list of {'date', 'value'} points per biomarker
+        # 'soa': {'dates': [...], 'values': [...]} parallel lists per biomarker
+        self.output_format = output_format
+
+        patterns = {
             'Total Cholesterol': r'(?:total\s+)?cholesterol\s*:?\s*(\d+(?:\.\d+)?)',
             'LDL': r'ldl\s*(?:cholesterol)?\s*:?\s*(\d+(?:\.\d+)?)',
             'HDL': r'hdl\s*(?:cholesterol)?\s*:?\s*(\d+(?:\.\d+)?)',
@@ -17,81 +96,330 @@ class BiomarkerExtractor:
             'Vitamin B12': r'(?:vitamin\s+)?b\s*12\s*:?\s*(\d+(?:\.\d+)?)',
             'HbA1c': r'hba1c\s*:?\s*(\d+(?:\.\d+)?)',
         }
+        self.biomarker_patterns = {
+            name: re.compile(pattern, re.IGNORECASE) for name, pattern in patterns.items()
+        }
+        self._date_re = re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})')
+
+        self._raw_patterns = patterns
+
+        # Cached results are only reused by the same extractor version and patterns
+        self._cache_tag = hashlib.sha256(
+            json.dumps([EXTRACTOR_VERSION, patterns], sort_keys=True).encode()
+        ).hexdigest()[:16]
+
+        # Literal that must appear in the text for each pattern to match
+        self.biomarker_keywords = {
+            'Total Cholesterol': 'cholesterol',
+            'LDL': 'ldl',
+            'HDL': 'hdl',
+            'Triglycerides': 'triglyceride',
+            'Creatinine': 'creatinine',
+            'Vitamin D': 'vitamin',
+            'Vitamin B12': '12',
+            'HbA1c': 'hba1c',
+        }
+        self._keyword_automaton = None
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword in set(self.biomarker_keywords.values()):
+                self._keyword_automaton.add_word(keyword, keyword)
+            self._keyword_automaton.make_automaton()
+
+        # Combined regexes keyed by the set of biomarkers they cover
+        self._combined_cache = {}
+
+    def _present_biomarkers(self, text):
+        """Return the biomarkers whose keyword occurs anywhere in the text"""
+        keywords = set(self.biomarker_keywords.values())
+        overlap = max(len(k) for k in keywords) - 1
+        seen = set()
+
+        # Lowercase one window at a time instead of copying the whole document;
+        # windows overlap so keywords spanning a boundary are still found
+        for start in range(0, len(text), KEYWORD_SCAN_WINDOW):
+            window = text[start:start + KEYWORD_SCAN_WINDOW + overlap].lower()
+            if self._keyword_automaton is not None:
+                seen.update(keyword for _, keyword in self._keyword_automaton.iter(window))
+            else:
+                seen.update(k for k in keywords if k in window)
+            if len(seen) == len(keywords):
+                break
+        return frozenset(b for b, k in self.biomarker_keywords.items() if k in seen)
+
+    def _combined_pattern(self, biomarkers):
+        """Build (or reuse) one alternation regex covering the given biomarkers"""
+        if biomarkers not in self._combined_cache:
+            # Each pattern becomes a named group; its value is the group right inside it
+            slugs = {
+                re.sub(r'\W', '_', name): name
+                for name in self._raw_patterns if name in biomarkers
+            }
+            source = "(?i)" + "|".join(
+                f"(?P<{slug}>{self._raw_patterns[name]})" for slug, name in slugs.items()
+            )
+            combined = None
+            if re2 is not None:
+                try:
+                    combined = re2.compile(source)
+                except re2.error:
+                    pass  # Syntax RE2 does not support; use the backtracking engine
+            if combined is None:
+                combined = re.compile(source)
+            groups = {slug: (name, combined.groupindex[slug] + 1) for slug, name in slugs.items()}
+            self._combined_cache[biomarkers] = (combined, groups)
+        return self._combined_cache[biomarkers]
+
+    def _cached(self, path, extract):
+        """Return the cached result for this file's contents, extracting on a miss"""
+        if self.cache_dir is None:
+            return extract(path)
+
+        try:
+            with open(path, 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    digest = hashlib.file_digest(f, 'sha256').hexdigest()
+                else:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return extract(path)
+        cache_path = self.cache_dir / f"{digest}.{self.output_format}.{self._cache_tag}.json"
+        try:
+            return json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache entry; extract afresh
+
+        data = extract(path)
+        if data:
+            self._write_cache(cache_path, data)
+        return data
+
+    def _write_cache(self, cache_path, data):
+        """Store a result in the cache; the cache is optional, so failures are only reported"""
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write a temp file and rename it so readers never see a partial entry
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.cache_dir,
+                                             suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                f.write(json.dumps(data))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not write cache entry {cache_path}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
     
     def extract_from_pdf(self, pdf_path):
         """Extract biomarker data from PDF file"""
+        return self._cached(pdf_path, self._extract_from_pdf)
+
+    def _extract_from_pdf(self, pdf_path):
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                
-                return self.parse_text_for_biomarkers(text)
+            values = {}
+            report_date = None
+
+            # Parse page by page and stop once every biomarker and the date are found
+            with closing(self._iter_pdf_pages(pdf_path)) as pages:
+                for page_text in pages:
+                    if report_date is None:
+                        report_date = self._parse_report_date(page_text)
+                    self._find_values(page_text, values)
+                    if report_date and len(values) == len(self._raw_patterns):
+                        break
+
+            return self._format_values(values, report_date)
         except Exception as e:
             print(f"Error reading PDF: {e}")
             return {}
     
+    def _iter_pdf_pages(self, pdf_path):
+        """Yield the text of each page, preferring PyMuPDF and falling back to PyPDF2"""
+        doc = None
+        if fitz is not None:
+            try:
+                doc = fitz.open(pdf_path)
+            except Exception as e:
+                print(f"PyMuPDF failed, falling back to PyPDF2: {e}")
+
+        if doc is not None:
+            with doc:
+                for page in doc:
+                    yield page.get_text("text")
+            return
+
+        with open(pdf_path, 'rb', buffering=1 << 20) as file:
+            if os.path.getsize(pdf_path) <= IN_MEMORY_PDF_LIMIT:
+                file = io.BytesIO(file.read())
+            pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            if page_count >= PARALLEL_PAGE_THRESHOLD:
+                executor = ProcessPoolExecutor(initializer=_init_page_worker, initargs=(pdf_path,))
+                try:
+                    yield from executor.map(_extract_page_text, range(page_count), chunksize=4)
+                finally:
+                    executor.shutdown(cancel_futures=True)
+            else:
+                for page in pdf_reader.pages:
+                    yield page.extract_text() or ""
+
     def parse_text_for_biomarkers(self, text):
         """Parse text and extract biomarker values"""
-        text = text.lower()
-        extracted_data = {}
-        
-        # Extract date from text
-        date_match = re.search(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', text)
-        report_date = datetime.now().strftime('%Y-%m-%d')
-        if date_match:
-            try:
-                report_date = datetime.strptime(date_match.group(1), '%m/%d/%Y').strftime('%Y-%m-%d')
-            except:
-                pass
-        
-        # Extract biomarker values
-        for biomarker, pattern in self.biomarker_patterns.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                value = float(matches[0])
-                extracted_data[biomarker] = [{
-                    'date': report_date,
-                    'value': value
-                }]
+        values = {}
+        self._find_values(text, values)
+        return self._format_values(values, self._parse_report_date(text))
+
+    def _parse_report_date(self, text):
+        """Return the report date for the first date in text, or None if there is none"""
+        date_match = self._date_re.search(text)
+        if not date_match:
+            return None
         
-        return extracted_data
+        # Build the date from the captured month/day/year instead of strptime
+        month, day, year = date_match.groups()
+        if len(year) == 2:
+            year = '20' + year
+        elif len(year) == 3:
+            return datetime.now().strftime('%Y-%m-%d')
+        try:
+            return datetime(int(year), int(month), int(day)).strftime('%Y-%m-%d')
+        except ValueError:
+            return datetime.now().strftime('%Y-%m-%d')
+
+    def _find_values(self, text, values):
+        """Record the first value in text of each biomarker not already in values"""
+        # Only biomarkers whose keyword occurs can match, so skip the rest
+        present = self._present_biomarkers(text)
+        if not present - values.keys():
+            return
+
+        # Extract biomarker values in a single pass, keeping the first hit
+        combined, groups = self._combined_pattern(present)
+        for match in combined.finditer(text):
+            biomarker, value_group = groups[match.lastgroup]
+            if biomarker in values:
+                continue
+            values[biomarker] = float(match.group(value_group))
+            if present <= values.keys():
+                break
+
+    def _format_values(self, values, report_date):
+        """Build the per-biomarker output from the values found, in pattern order"""
+        report_date = report_date or datetime.now().strftime('%Y-%m-%d')
+        return {
+            biomarker: self._series([report_date], [values[biomarker]])
+            for biomarker in self._raw_patterns if biomarker in values
+        }
+
+    def _series(self, dates, values):
+        """Package parallel date and value lists in the configured output layout"""
+        if self.output_format == 'soa':
+            return {'dates': dates, 'values': values}
+        return [{'date': date, 'value': value} for date, value in zip(dates, values)]
     
     def extract_from_csv(self, csv_path):
         """Extract biomarker data from CSV file"""
+        return self._cached(csv_path, self._extract_from_csv)
+
+    def _extract_from_csv(self, csv_path):
         try:
-            df = pd.read_csv(csv_path)
+            if os.path.getsize(csv_path) > STREAM_CSV_THRESHOLD:
+                return self._extract_from_csv_stream(csv_path)
+
+            # Peek at the header so only date and biomarker columns are parsed
+            header = pd.read_csv(csv_path, nrows=0).columns
+            col_to_biomarker = self._map_columns(header)
+            date_cols = [c for c in header if c in ('date', 'Date')]
+            df = self._read_csv_columns(csv_path, date_cols + list(col_to_biomarker), date_cols)
             extracted_data = {}
             
-            for column in df.columns:
-                if column.lower() in ['date', 'time', 'timestamp']:
-                    continue
-                    
-                # Check if column name matches any biomarker
-                for biomarker in self.biomarker_patterns.keys():
-                    if biomarker.lower() in column.lower():
-                        data_points = []
-                        for _, row in df.iterrows():
-                            if pd.notna(row[column]):
-                                date = row.get('date', row.get('Date', datetime.now().strftime('%Y-%m-%d')))
-                                data_points.append({
-                                    'date': str(date),
-                                    'value': float(row[column])
-                                })
-                        extracted_data[biomarker] = data_points
-                        break
+            # Resolve the date column once rather than per row
+            date_col = 'date' if 'date' in df.columns else ('Date' if 'Date' in df.columns else None)
+            if date_col:
+                dates = df[date_col].fillna('nan').astype(str).to_numpy(dtype=object)
+            else:
+                dates = np.full(len(df), datetime.now().strftime('%Y-%m-%d'))
+
+            for column, biomarker in col_to_biomarker.items():
+                vals = df[column].to_numpy(dtype=float, na_value=np.nan)
+                mask = ~np.isnan(vals)
+                extracted_data[biomarker] = self._series(dates[mask].tolist(), vals[mask].tolist())
             
             return extracted_data
         except Exception as e:
             print(f"Error reading CSV: {e}")
             return {}
     
+    def _read_csv_columns(self, csv_path, columns, text_columns):
+        """Load the given CSV columns, keeping text_columns as the raw strings"""
+        if pa_csv is None:
+            return pd.read_csv(csv_path, usecols=columns, dtype={column: str for column in text_columns})
+
+        # Read with pyarrow directly: it would otherwise infer timestamps for date columns
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={column: pa.string() for column in text_columns},
+            null_values=sorted(CSV_NA_VALUES),
+            strings_can_be_null=True,
+        )
+        return pa_csv.read_csv(csv_path, convert_options=convert_options).to_pandas()
+
+    def _map_columns(self, columns):
+        """Map CSV column names to the biomarker each one holds"""
+        lower_biomarkers = [(b, b.lower()) for b in self.biomarker_patterns]
+        col_to_biomarker = {}
+        for column in columns:
+            column_lower = column.lower()
+            if column_lower in ('date', 'time', 'timestamp'):
+                continue
+            biomarker = next((b for b, bl in lower_biomarkers if bl in column_lower), None)
+            if biomarker:
+                col_to_biomarker[column] = biomarker
+        return col_to_biomarker
+
+    def _extract_from_csv_stream(self, csv_path):
+        """Extract biomarker data from a large CSV file without loading it into memory"""
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        with open(csv_path, encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            col_to_biomarker = self._map_columns(fieldnames)
+            date_col = 'date' if 'date' in fieldnames else ('Date' if 'Date' in fieldnames else None)
+
+            buckets = {column: ([], []) for column in col_to_biomarker}
+            for row in reader:
+                # Missing dates become 'nan', as in the in-memory path
+                if date_col is None:
+                    date = today
+                else:
+                    date = row[date_col]
+                    if date is None or date in CSV_NA_VALUES:
+                        date = 'nan'
+                for column in col_to_biomarker:
+                    value = row[column]
+                    if value and value.strip() not in CSV_NA_VALUES:
+                        dates, values = buckets[column]
+                        dates.append(date)
+                        values.append(float(value))
+
+        return {
+            col_to_biomarker[column]: self._series(dates, values)
+            for column, (dates, values) in buckets.items()
+        }
+
     def save_to_json(self, data, output_path):
         """Save extracted data to JSON file"""
         try:
-            with open(output_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            if orjson is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(output_path, 'w') as f:
+                    json.dump(data, f, indent=2)
             print(f"Data saved to {output_path}")
         except Exception as e:
             print(f"Error saving data: {e}")
@@ -100,10 +428,13 @@ def main():
     parser = argparse.ArgumentParser(description='Extract biomarker data from health reports')
     parser.add_argument('input_file', help='Input file path (PDF or CSV)')
     parser.add_argument('--output', '-o', default='extracted_data.json', help='Output JSON file path')
+    parser.add_argument('--cache-dir', help='Directory for caching results by file content hash')
+    parser.add_argument('--format', choices=['aos', 'soa'], default='aos',
+                        help='Output layout: list of points (aos) or parallel date/value lists (soa)')
     
     args = parser.parse_args()
     
-    extractor = BiomarkerExtractor()
+    extractor = BiomarkerExtractor(cache_dir=args.cache_dir, output_format=args.format)
     
     if args.input_file.lower().endswith('.pdf'):
         data = extractor.extract_from_pdf(args.input_file)
@@ -9,28 +9,272 @@ import sys
 import json
 import re
 import argparse
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from bisect import bisect_left
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Any, Iterable, Sequence, TextIO
 import logging
+import queue
+import shlex
+import subprocess
+import tempfile
+import threading
+from collections import deque
 
 # Core PDF processing libraries
 try:
     import PyPDF2
     import pdfplumber
-    from pdf2image import convert_from_path
-    import pytesseract
     from PIL import Image
     import pandas as pd
     import numpy as np
 except ImportError as e:
     print(f"Missing required library: {e}")
-    print("Install with: pip install PyPDF2 pdfplumber pdf2image pytesseract pillow pandas numpy")
+    print("Install with: pip install PyPDF2 pdfplumber pillow pandas numpy")
     sys.exit(1)
 
+# Optional accelerators
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import regex  # Drop-in re replacement, faster on large alternations
+except ImportError:
+    regex = None
+
+# orjson equivalent of json.dump(indent=2, default=str) that also takes numpy values
+_ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+)
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Unit token in a table cell, e.g. "mg/dL" or "%"
+_UNIT_CELL_RE = re.compile(r'(\w+/\w+|%)')
+
+# First number in a table cell
+_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Skip pdfplumber table detection once text parsing finds this many biomarkers
+TABLE_PASS_THRESHOLD = 5
+
+# Biomarker counts at which an extraction method is good enough to stop early,
+# and below which OCR is attempted
+SUFFICIENT_SCORE = 5
+OCR_FALLBACK_SCORE = 3
+
+# Rendered pages allowed to wait for OCR at once
+OCR_QUEUE_SIZE = 4
+
+# Pages whose longer side is below this many pixels are upscaled before OCR
+OCR_MIN_SIDE = 1500
+
+# Documents with at least this many pages are OCR'd this many pages per tesseract run
+OCR_BATCH_SIZE = 10
+
+# OCR render resolution, and the resolution used to retry pages that yield nothing
+OCR_DPI = 200
+OCR_RETRY_DPI = 300
+
+# Series a parser analyzes before switching to the numba-compiled trend kernel; it
+# saves microseconds per call, so only long batch runs repay the import and compile
+TREND_JIT_MIN_SERIES = 50000
+
+# save_to_csv column order, and the low-cardinality columns stored as categoricals
+_CSV_COLS = ('biomarker', 'date', 'value', 'unit', 'status',
+             'patient_name', 'patient_age', 'patient_gender', 'report_date')
+_CSV_CATEGORY_COLS = ['biomarker', 'unit', 'status', 'patient_gender']
+
+# One summary report line per biomarker, and the marker appended for notable statuses
+_MARKER_FMT = "  {marker}: {value} ({status}){ind}\n"
+_STATUS_INDICATOR = {
+    'high': " ⚠️",
+    'diabetic': " ⚠️",
+    'deficient': " ⚠️",
+    'normal': " ✓",
+    'sufficient': " ✓"
+}
+
+# Summary report sections, in display order
+_CATEGORY_ORDER = (
+    ('Lipid Profile', ('Total Cholesterol', 'LDL', 'HDL', 'Triglycerides')),
+    ('Diabetes Markers', ('Glucose', 'HbA1c')),
+    ('Kidney Function', ('Creatinine', 'BUN', 'eGFR')),
+    ('Vitamins', ('Vitamin D', 'Vitamin B12', 'Folate')),
+    ('Thyroid Function', ('TSH', 'T3', 'T4')),
+    ('Minerals', ('Calcium', 'Magnesium', 'Potassium', 'Sodium', 'Iron', 'Ferritin'))
+)
+_ALL_CATEGORIZED = frozenset(marker for _, markers in _CATEGORY_ORDER for marker in markers)
+
+# Trend directions in _trend_kernel's code order
+_TREND_DIRECTIONS = ('stable', 'increasing', 'decreasing')
+
+# Trend direction markers shown in the summary report
+_DIRECTION_EMOJI = {
+    'increasing': '📈',
+    'decreasing': '📉',
+    'stable': '➡️'
+}
+
+# Recommendation texts, interned so the dedup set in _generate_recommendations
+# compares them by identity
+_REC_CHOLESTEROL = sys.intern("Consider dietary changes to reduce cholesterol intake")
+_REC_LDL = sys.intern("Focus on reducing saturated fats and increasing fiber intake")
+_REC_HDL = sys.intern("Increase physical activity to boost HDL cholesterol")
+_REC_TRIGLYCERIDES = sys.intern("Limit refined carbohydrates and added sugars")
+_REC_GLUCOSE = sys.intern("Monitor blood sugar levels and consider diabetes management strategies")
+_REC_VITAMIN_D = sys.intern("Consider vitamin D supplementation and increased sun exposure")
+_REC_VITAMIN_B12 = sys.intern("Consider vitamin B12 supplementation or B12-rich foods")
+_REC_CREATININE = sys.intern("Stay well-hydrated and monitor kidney function")
+
+# Recommendation for each (biomarker, lowercased status) that warrants one
+_RECO_TABLE = {
+    ('Total Cholesterol', 'high'): _REC_CHOLESTEROL,
+    ('LDL', 'high'): _REC_LDL,
+    ('HDL', 'low'): _REC_HDL,
+    ('Triglycerides', 'high'): _REC_TRIGLYCERIDES,
+    ('Glucose', 'prediabetic'): _REC_GLUCOSE,
+    ('Glucose', 'diabetic'): _REC_GLUCOSE,
+    ('HbA1c', 'prediabetic'): _REC_GLUCOSE,
+    ('HbA1c', 'diabetic'): _REC_GLUCOSE,
+    ('Vitamin D', 'deficient'): _REC_VITAMIN_D,
+    ('Vitamin D', 'insufficient'): _REC_VITAMIN_D,
+    ('Vitamin B12', 'deficient'): _REC_VITAMIN_B12,
+    ('Creatinine', 'high'): _REC_CREATININE
+}
+
+# Distinct strings whose parsed date is remembered
+DATE_CACHE_SIZE = 4096
+
+# An uppercase letter that isn't part of an escape such as \S or \D
+_UPPERCASE_LITERAL_RE = re.compile(r'(?<!\\)[A-Z]')
+
+# Global inline flags such as "(?i)" at the start of a pattern
+_GLOBAL_FLAGS_RE = re.compile(r'\(\?([aiLmsux]+)\)')
+
+# Month abbreviations used by the named-month date patterns
+_MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+
+# Leading optional groups such as "(?:total\s+)?" and the literal text that follows
+_LEADING_OPTIONAL_RE = re.compile(r'^(?:\(\?:[^()]*\)[?*])+')
+_LITERAL_PREFIX_RE = re.compile(r'[A-Za-z0-9-]+')
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """Return lowercase text every match of pattern must contain, or None if unknown"""
+    depth = 0
+    for char in pattern:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return None  # Top-level alternation has no single required literal
+
+    body = _LEADING_OPTIONAL_RE.sub('', pattern)
+    match = _LITERAL_PREFIX_RE.match(body)
+    if not match:
+        return None
+    literal = match.group(0)
+    if body[match.end():match.end() + 1] in ('?', '*', '{'):
+        literal = literal[:-1]  # Last character is optional
+    return literal.lower() or None
+
+
+def _for_lowercase_text(pattern: str) -> str:
+    """Wrap pattern for matching against lowercased text
+
+    Lowercase patterns match as-is without IGNORECASE; patterns with uppercase
+    letters (e.g. from a config file) keep case-insensitivity in a scoped group.
+    Leading global flags like "(?i)" become scoped flags, since global flags are
+    only allowed at the very start of the combined regex.
+    """
+    flags = ''
+    while True:
+        flag_match = _GLOBAL_FLAGS_RE.match(pattern)
+        if not flag_match:
+            break
+        flags += flag_match.group(1)
+        pattern = pattern[flag_match.end():]
+    if 'i' not in flags and _UPPERCASE_LITERAL_RE.search(pattern):
+        flags += 'i'
+    return f"(?{flags}:{pattern})"
+
+
+def _compile_alternation(alternatives: List[Tuple[str, str]], flags: int) -> re.Pattern:
+    """Compile (biomarker, pattern) alternatives into one alternation regex
+
+    If the union doesn't compile (e.g. two config patterns define the same group
+    name), the alternatives that break it are skipped with a warning.
+    """
+    try:
+        return re.compile('|'.join(p for _, p in alternatives) or r'(?!)', flags)
+    except re.error:
+        pass
+
+    kept = []
+    for biomarker, pattern in alternatives:
+        try:
+            re.compile('|'.join(kept + [pattern]), flags)
+        except re.error as e:
+            logger.warning(f"Skipping unusable pattern for {biomarker}: {e}")
+            continue
+        kept.append(pattern)
+    return re.compile('|'.join(kept) or r'(?!)', flags)
+
+
+def _iso_date(year: str, month: int, day: int) -> Optional[str]:
+    """Return YYYY-MM-DD for the given parts, or None if they aren't a real date"""
+    if len(year) == 2:
+        century = 2000 if int(year) < 69 else 1900  # Same pivot as strptime's %y
+        full_year = century + int(year)
+    elif len(year) == 4:
+        full_year = int(year)
+    else:
+        return None
+    try:
+        return datetime(full_year, month, day).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def _date_from_match(match: re.Match) -> Optional[str]:
+    """Build an ISO date from a date pattern's named groups"""
+    parts = match.groupdict()
+    if parts.get('sep') != parts.get('sep2'):
+        return None  # Mixed separators such as "1/2-2024"
+    if parts.get('mon'):
+        candidates = [(_MONTHS[parts['mon'][:3].lower()], parts['d'])]
+    elif parts.get('m'):
+        candidates = [(parts['m'], parts['d'])]
+    elif len(parts['y']) == 4:
+        candidates = [(parts['a'], parts['b']), (parts['b'], parts['a'])]  # Month first, then day first
+    else:
+        candidates = [(parts['a'], parts['b'])]  # Two-digit years are month first only
+    for month, day in candidates:
+        date = _iso_date(parts['y'], int(month), int(day))
+        if date:
+            return date
+    return None
+
+
+def _score(data: Dict[str, Any]) -> int:
+    """Score an extraction result by the number of biomarkers found"""
+    return len(data.get('biomarkers', {}))
+
 class AdvancedPDFParser:
     """Advanced PDF parser with multiple extraction methods and OCR support"""
     
@@ -40,12 +284,131 @@ class AdvancedPDFParser:
         self.date_patterns = self._load_date_patterns()
         self.unit_conversions = self._load_unit_conversions()
         self.clinical_ranges = self._load_clinical_ranges()
+        self.validation_ranges = self._load_validation_ranges()
+        # Plausibility bounds split out for the per-cell checks; unknown biomarkers are unbounded
+        self._valid_lo = {biomarker: lo for biomarker, (lo, _) in self.validation_ranges.items()}
+        self._valid_hi = {biomarker: hi for biomarker, (_, hi) in self.validation_ranges.items()}
+        self.patient_info_patterns = self._load_patient_info_patterns()
+        self.unit_patterns = self._load_unit_patterns()
         
         # OCR configuration
-        self.ocr_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:/-() '
+        self.ocr_config = r'--oem 1 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:/-() '
+
+        # Trend series analyzed so far, to decide when compiling the kernel pays off
+        self._trend_series_count = 0
         
         if config_file and os.path.exists(config_file):
             self._load_config(config_file)
+
+        self._compile_patterns()
+        self._index_clinical_ranges()
+
+    def _compile_patterns(self) -> None:
+        """Compile all extraction patterns once so parsing reuses them"""
+        # Keywords that must occur in the text for a biomarker to match at all;
+        # biomarkers with any pattern lacking a required literal are always scanned
+        self._keyword_biomarkers: Dict[str, set] = {}
+        self._always_scan = set()
+        for biomarker, patterns in self.biomarker_patterns.items():
+            literals = [_required_literal(p) for p in patterns]
+            if None in literals:
+                self._always_scan.add(biomarker)
+                continue
+            for literal in literals:
+                self._keyword_biomarkers.setdefault(literal, set()).add(biomarker)
+
+        self._keyword_automaton = None
+        if ahocorasick is not None and self._keyword_biomarkers:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword in self._keyword_biomarkers:
+                self._keyword_automaton.add_word(keyword, keyword)
+            self._keyword_automaton.make_automaton()
+
+        # Combined alternation regexes keyed by the set of biomarkers they cover
+        self._combined_cache = {}
+
+        # One header matcher per biomarker: its patterns with the value capture stripped
+        self._header_res = {}
+        for biomarker, patterns in self.biomarker_patterns.items():
+            alternatives = []
+            for pattern in patterns:
+                simple_pattern = pattern.replace(r'\s*:?\s*(\d+(?:\.\d+)?)', '').replace(r'(?:', '').replace(r')?', '')
+                try:
+                    re.compile(simple_pattern)
+                except re.error as e:
+                    logger.warning(f"Skipping unusable header pattern for {biomarker}: {e}")
+                    continue
+                alternatives.append((biomarker, _for_lowercase_text(simple_pattern)))
+            if alternatives:
+                self._header_res[biomarker] = _compile_alternation(alternatives, 0)
+
+        self._date_compiled = [re.compile(p, re.IGNORECASE) for p in self.date_patterns]
+        # Table cells repeat heavily, so memoize date parsing per string
+        self._try_parse_date = lru_cache(maxsize=DATE_CACHE_SIZE)(self._parse_date)
+        self._name_compiled = [re.compile(p, re.IGNORECASE) for p in self.patient_info_patterns['name']]
+        self._age_compiled = [re.compile(p, re.IGNORECASE) for p in self.patient_info_patterns['age']]
+        self._gender_compiled = [re.compile(p, re.IGNORECASE) for p in self.patient_info_patterns['gender']]
+        self._unit_compiled = {
+            key: re.compile(p, re.IGNORECASE) for key, p in self.unit_patterns.items()
+        }
+
+    def _present_biomarkers(self, text_lower: str) -> frozenset:
+        """Return the biomarkers whose patterns could match the lowercased text"""
+        if self._keyword_automaton is not None:
+            keywords = {keyword for _, keyword in self._keyword_automaton.iter(text_lower)}
+        else:
+            keywords = {keyword for keyword in self._keyword_biomarkers if keyword in text_lower}
+
+        present = set(self._always_scan)
+        for keyword in keywords:
+            present.update(self._keyword_biomarkers[keyword])
+        return frozenset(present)
+
+    def _combined_pattern(self, biomarkers: frozenset) -> Tuple[re.Pattern, Dict[str, Tuple[str, int, int]]]:
+        """Return one alternation regex over the patterns of the given biomarkers
+
+        Each pattern becomes a named group so a single finditer pass covers all of
+        them; groups maps each name to (biomarker, value group, pattern priority),
+        where the value group is the first group inside the named group.
+        """
+        if biomarkers not in self._combined_cache:
+            alternatives = []
+            group_names = {}
+            for biomarker, patterns in self.biomarker_patterns.items():
+                if biomarker not in biomarkers:
+                    continue
+                for priority, pattern in enumerate(patterns):
+                    name = f"_g{len(alternatives)}"
+                    alternatives.append((biomarker, f"(?P<{name}>{_for_lowercase_text(pattern)})"))
+                    group_names[name] = (biomarker, priority)
+            # Text is lowercased before matching, so only anchored patterns need flags
+            flags = re.MULTILINE if any('^' in p or '$' in p for _, p in alternatives) else 0
+            combined = _compile_alternation(alternatives, flags)
+            # The regex module reports a pattern's own named groups as lastgroup, so
+            # only patterns without them switch engines
+            if regex is not None and all(name in group_names for name in combined.groupindex):
+                try:
+                    combined = regex.compile(combined.pattern, flags | regex.VERSION0)
+                except regex.error:
+                    pass  # Syntax the regex module does not accept; keep re
+            groups = {
+                name: (biomarker, combined.groupindex[name] + 1, priority)
+                for name, (biomarker, priority) in group_names.items()
+                if name in combined.groupindex  # Skipped patterns have no group
+            }
+            self._combined_cache[biomarkers] = (combined, groups)
+        return self._combined_cache[biomarkers]
+
+    def _index_clinical_ranges(self) -> None:
+        """Sort each biomarker's clinical ranges by upper bound for bisect lookups"""
+        self._range_bounds = {}
+        for biomarker, ranges in self.clinical_ranges.items():
+            ordered = sorted(ranges.items(), key=lambda item: item[1][1])
+            self._range_bounds[biomarker] = (
+                tuple(float(max_val) for _, (_, max_val) in ordered),
+                tuple(float(min_val) for _, (min_val, _) in ordered),
+                tuple(status.title() for status, _ in ordered)
+            )
     
     def _load_biomarker_patterns(self) -> Dict[str, List[str]]:
         """Load comprehensive biomarker extraction patterns"""
@@ -168,13 +531,44 @@ class AdvancedPDFParser:
     def _load_date_patterns(self) -> List[str]:
         """Load date extraction patterns"""
         return [
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(\d{4}[/-]\d{1,2}[/-]\d{1,2})',
-            r'(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{2,4})',
-            r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+\d{1,2},?\s+\d{2,4})',
-            r'(\d{1,2}\s+(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{2,4})'
+            r'(?P<a>\d{1,2})(?P<sep>[/-])(?P<b>\d{1,2})(?P<sep2>[/-])(?P<y>\d{2,4})',
+            r'(?P<y>\d{4})(?P<sep>[/-])(?P<m>\d{1,2})(?P<sep2>[/-])(?P<d>\d{1,2})',
+            r'(?P<d>\d{1,2})\s+(?P<mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+(?P<y>\d{2,4})',
+            r'(?P<mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+(?P<d>\d{1,2}),?\s+(?P<y>\d{2,4})',
+            r'(?P<d>\d{1,2})\s+(?P<mon>january|february|march|april|may|june|july|august|september|october|november|december)\s+(?P<y>\d{2,4})'
         ]
     
+    def _load_patient_info_patterns(self) -> Dict[str, List[str]]:
+        """Load patient name, age and gender extraction patterns"""
+        return {
+            'name': [
+                r'patient\s*(?:name)?:?\s*([a-zA-Z\s]+)',
+                r'name:?\s*([a-zA-Z\s]+)',
+                r'patient:?\s*([a-zA-Z\s]+)'
+            ],
+            'age': [
+                r'age:?\s*(\d+)',
+                r'(\d+)\s*years?\s*old',
+                r'(\d+)\s*yo'
+            ],
+            'gender': [
+                r'gender:?\s*(male|female|m|f)',
+                r'sex:?\s*(male|female|m|f)',
+                r'\b(male|female)\b'
+            ]
+        }
+
+    def _load_unit_patterns(self) -> Dict[str, str]:
+        """Load unit extraction patterns keyed by biomarker name fragment"""
+        return {
+            'cholesterol': r'(mg/dl|mmol/l)',
+            'glucose': r'(mg/dl|mmol/l)',
+            'creatinine': r'(mg/dl|μmol/l|umol/l)',
+            'vitamin d': r'(ng/ml|nmol/l)',
+            'vitamin b12': r'(pg/ml|pmol/l)',
+            'hba1c': r'(%|mmol/mol)'
+        }
+
     def _load_unit_conversions(self) -> Dict[str, Dict[str, float]]:
         """Load unit conversion factors"""
         return {
@@ -206,6 +600,23 @@ class AdvancedPDFParser:
             'Vitamin B12': {'deficient': (0, 300), 'low': (300, 400), 'normal': (400, 999)}
         }
     
+    def _load_validation_ranges(self) -> Dict[str, Tuple[float, float]]:
+        """Load plausible value ranges used to reject misread numbers"""
+        return {
+            'Total Cholesterol': (50, 1000),
+            'LDL': (20, 800),
+            'HDL': (10, 200),
+            'Triglycerides': (20, 2000),
+            'Glucose': (30, 800),
+            'HbA1c': (3.0, 20.0),
+            'Creatinine': (0.1, 20.0),
+            'Vitamin D': (1, 200),
+            'Vitamin B12': (50, 5000),
+            'TSH': (0.01, 100.0),
+            'Iron': (10, 500),
+            'Ferritin': (1, 5000)
+        }
+
     def parse_pdf(self, pdf_path: str, use_ocr: bool = False) -> Dict[str, Any]:
         """
         Parse PDF using multiple methods
@@ -232,20 +643,21 @@ class AdvancedPDFParser:
             logger.warning(f"pdfplumber extraction failed: {e}")
         
         # Method 2: PyPDF2 (fallback for text extraction)
-        if not extracted_data:
+        if _score(extracted_data) < SUFFICIENT_SCORE:
             try:
                 pypdf2_data = self._extract_with_pypdf2(pdf_path)
-                if pypdf2_data:
-                    extracted_data.update(pypdf2_data)
+                if pypdf2_data and (not extracted_data or _score(pypdf2_data) > _score(extracted_data)):
+                    extracted_data = pypdf2_data
                     logger.info("Successfully extracted data using PyPDF2")
             except Exception as e:
                 logger.warning(f"PyPDF2 extraction failed: {e}")
         
         # Method 3: OCR (for scanned PDFs)
-        if (not extracted_data or use_ocr):
+        if use_ocr or _score(extracted_data) < OCR_FALLBACK_SCORE:
             try:
                 ocr_data = self._extract_with_ocr(pdf_path)
-                if ocr_data:
+                # An automatic OCR pass only replaces text-layer results it beats
+                if ocr_data and (use_ocr or not extracted_data or _score(ocr_data) > _score(extracted_data)):
                     extracted_data.update(ocr_data)
                     logger.info("Successfully extracted data using OCR")
             except Exception as e:
@@ -263,46 +675,57 @@ class AdvancedPDFParser:
         extracted_data = {'biomarkers': {}, 'metadata': {}}
         
         with pdfplumber.open(pdf_path) as pdf:
-            all_text = ""
-            tables = []
-            
-            for page in pdf.pages:
-                # Extract text
-                page_text = page.extract_text()
-                if page_text:
-                    all_text += page_text + "\n"
-                
-                # Extract tables
-                page_tables = page.extract_tables()
-                if page_tables:
-                    tables.extend(page_tables)
-            
             # Parse text for biomarkers
+            all_text = self._extract_text_pdfplumber(pdf)
             if all_text:
                 text_data = self._parse_text_for_biomarkers(all_text)
                 extracted_data['biomarkers'].update(text_data.get('biomarkers', {}))
                 extracted_data['metadata'].update(text_data.get('metadata', {}))
             
-            # Parse tables for biomarkers
-            if tables:
-                table_data = self._parse_tables_for_biomarkers(tables)
-                extracted_data['biomarkers'].update(table_data.get('biomarkers', {}))
+            # Table detection is the expensive part, so only run it when the
+            # text pass came up short
+            if len(extracted_data['biomarkers']) < TABLE_PASS_THRESHOLD:
+                tables = self._extract_tables_pdfplumber(pdf)
+                if tables:
+                    table_data = self._parse_tables_for_biomarkers(
+                        tables, extracted_data['metadata'].get('report_date')
+                    )
+                    extracted_data['biomarkers'].update(table_data.get('biomarkers', {}))
         
         return extracted_data
     
+    def _extract_text_pdfplumber(self, pdf) -> str:
+        """Extract page text from an open pdfplumber document"""
+        parts = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                parts.append(page_text + "\n")
+        return "".join(parts)
+
+    def _extract_tables_pdfplumber(self, pdf) -> List[List[List[Any]]]:
+        """Extract tables from an open pdfplumber document"""
+        tables = []
+        for page in pdf.pages:
+            page_tables = page.extract_tables()
+            if page_tables:
+                tables.extend(page_tables)
+        return tables
+
     def _extract_with_pypdf2(self, pdf_path: str) -> Dict[str, Any]:
         """Extract data using PyPDF2"""
         extracted_data = {'biomarkers': {}, 'metadata': {}}
         
         with open(pdf_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            all_text = ""
+            parts = []
             
             for page in pdf_reader.pages:
                 text = page.extract_text()
                 if text:
-                    all_text += text + "\n"
+                    parts.append(text + "\n")
             
+            all_text = "".join(parts)
             if all_text:
                 text_data = self._parse_text_for_biomarkers(all_text)
                 extracted_data.update(text_data)
@@ -313,46 +736,134 @@ class AdvancedPDFParser:
         """Extract data using OCR"""
         extracted_data = {'biomarkers': {}, 'metadata': {}}
         
-        # Convert PDF to images
+        # OCR libraries are only needed here, so they are imported on first use
+        # (pip install pdf2image pytesseract)
+        from pdf2image import pdfinfo_from_path
+
         try:
-            images = convert_from_path(pdf_path, dpi=300)
+            page_count = pdfinfo_from_path(pdf_path)['Pages']
         except Exception as e:
             logger.error(f"Failed to convert PDF to images: {e}")
             return extracted_data
         
-        all_text = ""
-        for i, image in enumerate(images):
-            try:
-                # Preprocess image for better OCR
-                processed_image = self._preprocess_image_for_ocr(image)
-                
-                # Extract text using OCR
-                text = pytesseract.image_to_string(processed_image, config=self.ocr_config)
-                all_text += text + "\n"
-                
-                logger.info(f"OCR processed page {i+1}/{len(images)}")
-            except Exception as e:
-                logger.warning(f"OCR failed for page {i+1}: {e}")
+        page_texts = self._ocr_pages(pdf_path, range(1, page_count + 1), OCR_DPI, page_count)
+        text_data = self._parse_ocr_pages(page_texts)
         
-        if all_text:
-            text_data = self._parse_text_for_biomarkers(all_text)
-            extracted_data.update(text_data)
+        # Re-OCR pages that produced text but no biomarkers at a higher resolution;
+        # pages with no text at all (e.g. tesseract missing or failing) would fail again
+        if _score(text_data) < OCR_FALLBACK_SCORE:
+            retry_pages = [
+                page_number for page_number, page_text in sorted(page_texts.items())
+                if page_text.strip() and not self._parse_text_for_biomarkers(page_text)['biomarkers']
+            ]
+            if retry_pages:
+                logger.info(f"Retrying OCR at {OCR_RETRY_DPI} DPI for {len(retry_pages)} page(s)")
+                page_texts.update(self._ocr_pages(pdf_path, retry_pages, OCR_RETRY_DPI, page_count))
+                text_data = self._parse_ocr_pages(page_texts)
         
+        extracted_data.update(text_data)
         return extracted_data
     
-    def _preprocess_image_for_ocr(self, image: Image.Image) -> Image.Image:
+    def _ocr_pages(self, pdf_path: str, page_numbers: Sequence[int], dpi: int, page_count: int) -> Dict[int, str]:
+        """OCR the given pages, returning their text keyed by page number"""
+        # Render pages on a background thread while earlier pages are OCR'd;
+        # the bounded queue keeps only a few decoded pages in memory at once
+        render_q = queue.Queue(maxsize=OCR_QUEUE_SIZE)
+        stop_rendering = threading.Event()
+        renderer = threading.Thread(
+            target=self._render_pages, args=(pdf_path, page_numbers, dpi, render_q, stop_rendering),
+            daemon=True
+        )
+        renderer.start()
+
+        # OCR pages in parallel; each worker runs its own tesseract process. Long
+        # documents are sent in batches so tesseract loads its model once per batch
+        batch_size = OCR_BATCH_SIZE if len(page_numbers) >= OCR_BATCH_SIZE else 1
+        page_texts = {}
+        max_workers = min(-(-len(page_numbers) // batch_size), os.cpu_count() or 1) or 1
+        rendered_all = False
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                in_flight = deque()
+                batch = []
+                while True:
+                    item = render_q.get()
+                    if item is not None:
+                        batch.append(item)
+                    if batch and (item is None or len(batch) == batch_size):
+                        batch_pages, images = zip(*batch)
+                        in_flight.append((batch_pages, executor.submit(_ocr_page_batch, images, self.ocr_config)))
+                        batch = []
+                    if item is None:
+                        rendered_all = True
+                        break
+                    if len(in_flight) >= max_workers:
+                        self._collect_ocr_batch(*in_flight.popleft(), page_count, page_texts)
+                while in_flight:
+                    self._collect_ocr_batch(*in_flight.popleft(), page_count, page_texts)
+        finally:
+            # If OCR failed part way, stop the renderer and drain the queue so it
+            # isn't left blocked on a full queue
+            stop_rendering.set()
+            while not rendered_all:
+                rendered_all = render_q.get() is None
+            renderer.join()
+
+        return page_texts
+
+    def _parse_ocr_pages(self, page_texts: Dict[int, str]) -> Dict[str, Any]:
+        """Parse OCR'd page text in page order"""
+        all_text = "".join(page_texts[page_number] + "\n" for page_number in sorted(page_texts))
+        if not all_text:
+            return {}
+        return self._parse_text_for_biomarkers(all_text)
+
+    def _render_pages(self, pdf_path: str, page_numbers: Sequence[int], dpi: int, render_q: queue.Queue,
+                      stop: threading.Event) -> None:
+        """Render PDF pages one at a time onto render_q until stop is set, followed by None"""
+        try:
+            from pdf2image import convert_from_path
+            for page_number in page_numbers:
+                if stop.is_set():
+                    break
+                try:
+                    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+                except Exception as e:
+                    logger.error(f"Failed to convert PDF page {page_number} to image: {e}")
+                    break
+                if images:
+                    render_q.put((page_number, images[0]))
+        finally:
+            render_q.put(None)
+
+    def _collect_ocr_batch(self, page_numbers: Tuple[int, ...], future, page_count: int,
+                           page_texts: Dict[int, str]) -> None:
+        """Wait for one batch's OCR results and record each page's text"""
+        try:
+            texts = future.result()
+        except Exception as e:
+            for page_number in page_numbers:
+                logger.warning(f"OCR failed for page {page_number}: {e}")
+            return
+        for page_number, text in zip(page_numbers, texts):
+            page_texts[page_number] = text
+            logger.info(f"OCR processed page {page_number}/{page_count}")
+
+    @staticmethod
+    def _preprocess_image_for_ocr(image: Image.Image) -> Image.Image:
         """Preprocess image to improve OCR accuracy"""
         # Convert to grayscale
         if image.mode != 'L':
             image = image.convert('L')
         
-        # Resize if too small
+        # Resize if too small; bicubic is as good as LANCZOS for tesseract at small scales
         width, height = image.size
-        if width < 1000:
-            scale_factor = 1000 / width
+        if max(width, height) < OCR_MIN_SIDE:
+            scale_factor = OCR_MIN_SIDE / max(width, height)
             new_width = int(width * scale_factor)
             new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            resample = Image.Resampling.BICUBIC if scale_factor < 1.5 else Image.Resampling.LANCZOS
+            image = image.resize((new_width, new_height), resample)
         
         return image
     
@@ -369,133 +880,131 @@ class AdvancedPDFParser:
         patient_info = self._extract_patient_info(text)
         extracted_data['metadata'].update(patient_info)
         
-        # Extract biomarker values
-        for biomarker, patterns in self.biomarker_patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, text_lower, re.IGNORECASE | re.MULTILINE)
-                if matches:
-                    try:
-                        value = float(matches[0])
-                        if self._validate_biomarker_value(biomarker, value):
-                            extracted_data['biomarkers'][biomarker] = [{
-                                'date': report_date,
-                                'value': value,
-                                'unit': self._extract_unit(text, biomarker),
-                                'status': self._get_clinical_status(biomarker, value)
-                            }]
-                            break  # Use first valid match
-                    except (ValueError, IndexError):
-                        continue
+        # Extract biomarker values in one pass. Patterns are listed in priority order
+        # (full name before abbreviation): only each pattern's first match counts, and
+        # the highest-priority pattern with a valid first match wins, however late in
+        # the text it occurs
+        # Only biomarkers whose keywords occur in the text can match
+        present = self._present_biomarkers(text_lower)
+        combined, groups = self._combined_pattern(present)
+        best = {}
+        matched_patterns = set()
+        pending = len(present)
+        for match in combined.finditer(text_lower):
+            if match.lastgroup in matched_patterns:
+                continue
+            matched_patterns.add(match.lastgroup)
+            biomarker, value_group, priority = groups[match.lastgroup]
+            if biomarker in best and best[biomarker][0] <= priority:
+                continue
+            try:
+                value = float(match.group(value_group))
+            except (TypeError, ValueError):
+                continue
+            if self._validate_biomarker_value(biomarker, value):
+                best[biomarker] = (priority, value)
+                if priority == 0:
+                    pending -= 1
+                    if not pending:
+                        break  # Every biomarker has its top-priority match
+
+        biomarkers = extracted_data['biomarkers']
+        for biomarker in self.biomarker_patterns:
+            if biomarker in best:
+                value = best[biomarker][1]
+                biomarkers[biomarker] = [{
+                    'date': report_date,
+                    'value': value,
+                    'unit': self._extract_unit(text, biomarker),
+                    'status': self._get_clinical_status(biomarker, value)
+                }]
         
         return extracted_data
     
-    def _parse_tables_for_biomarkers(self, tables: List[List[List[str]]]) -> Dict[str, Any]:
+    def _parse_tables_for_biomarkers(self, tables: List[List[List[str]]],
+                                     report_date: Optional[str] = None) -> Dict[str, Any]:
         """Parse tables for biomarker data"""
         extracted_data = {'biomarkers': {}}
+        # Rows without their own date fall back to the document's report date
+        default_date = report_date or datetime.now().strftime('%Y-%m-%d')
         
         for table in tables:
             if not table or len(table) < 2:
                 continue
             
-            # Convert table to DataFrame for easier processing
-            df = pd.DataFrame(table[1:], columns=table[0])
-            
-            # Look for biomarker columns
-            for col in df.columns:
+            # Match each header against the biomarkers once per table
+            header_matches = []
+            for col_idx, col in enumerate(table[0]):
                 if not col:
                     continue
-                
                 col_lower = col.lower().strip()
-                
-                # Check if column matches any biomarker
-                for biomarker, patterns in self.biomarker_patterns.items():
-                    for pattern in patterns:
-                        # Create a simpler pattern for column matching
-                        simple_pattern = pattern.replace(r'\s*:?\s*(\d+(?:\.\d+)?)', '').replace(r'(?:', '').replace(r')?', '')
-                        if re.search(simple_pattern, col_lower, re.IGNORECASE):
-                            # Extract values from this column
-                            for _, row in df.iterrows():
-                                try:
-                                    value_str = str(row[col]).strip()
-                                    # Extract numeric value
-                                    value_match = re.search(r'(\d+(?:\.\d+)?)', value_str)
-                                    if value_match:
-                                        value = float(value_match.group(1))
-                                        if self._validate_biomarker_value(biomarker, value):
-                                            if biomarker not in extracted_data['biomarkers']:
-                                                extracted_data['biomarkers'][biomarker] = []
-                                            
-                                            # Try to find date in the same row
-                                            date = self._extract_date_from_row(row)
-                                            
-                                            extracted_data['biomarkers'][biomarker].append({
-                                                'date': date,
-                                                'value': value,
-                                                'unit': self._extract_unit_from_cell(value_str),
-                                                'status': self._get_clinical_status(biomarker, value)
-                                            })
-                                except (ValueError, AttributeError):
-                                    continue
-                            break
+                for biomarker, header_re in self._header_res.items():
+                    if header_re.search(col_lower):
+                        header_matches.append((col_idx, biomarker))
+            if not header_matches:
+                continue
+
+            rows = table[1:]
+            row_dates = None
+
+            for col_idx, biomarker in header_matches:
+                min_val = self._valid_lo.get(biomarker, -np.inf)
+                max_val = self._valid_hi.get(biomarker, np.inf)
+                for row_idx, row in enumerate(rows):
+                    cell = str(row[col_idx] if col_idx < len(row) else None).strip()
+                    number_match = _NUMBER_RE.search(cell)
+                    if not number_match:
+                        continue
+
+                    value = float(number_match.group(1))
+                    if not min_val <= value <= max_val:
+                        continue
+
+                    # Try to find a date in each row, once per table
+                    if row_dates is None:
+                        row_dates = [self._extract_date_from_row(r, default_date) for r in rows]
+
+                    extracted_data['biomarkers'].setdefault(biomarker, []).append({
+                        'date': row_dates[row_idx],
+                        'value': value,
+                        'unit': self._extract_unit_from_cell(cell),
+                        'status': self._get_clinical_status(biomarker, value)
+                    })
         
         return extracted_data
     
+    def _parse_date(self, text: str) -> Optional[str]:
+        """Return the first date found in text as YYYY-MM-DD, or None"""
+        for pattern in self._date_compiled:
+            match = pattern.search(text)
+            if match:
+                date = _date_from_match(match)
+                if date:
+                    return date
+        return None
+
     def _extract_date(self, text: str) -> str:
         """Extract date from text"""
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                date_str = matches[0]
-                try:
-                    # Try different date formats
-                    for fmt in ['%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d', '%Y-%m-%d', 
-                               '%d/%m/%Y', '%d-%m-%Y', '%m/%d/%y', '%m-%d-%y']:
-                        try:
-                            parsed_date = datetime.strptime(date_str, fmt)
-                            return parsed_date.strftime('%Y-%m-%d')
-                        except ValueError:
-                            continue
-                    
-                    # Try parsing month names
-                    if any(month in date_str.lower() for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                                                                   'jul', 'aug', 'sep', 'oct', 'nov', 'dec']):
-                        try:
-                            parsed_date = datetime.strptime(date_str, '%b %d, %Y')
-                            return parsed_date.strftime('%Y-%m-%d')
-                        except ValueError:
-                            try:
-                                parsed_date = datetime.strptime(date_str, '%d %b %Y')
-                                return parsed_date.strftime('%Y-%m-%d')
-                            except ValueError:
-                                pass
-                except Exception:
-                    pass
-        
         # Default to current date if no date found
-        return datetime.now().strftime('%Y-%m-%d')
+        return self._try_parse_date(text) or datetime.now().strftime('%Y-%m-%d')
     
-    def _extract_date_from_row(self, row: pd.Series) -> str:
+    def _extract_date_from_row(self, row: Sequence[Any], default: str) -> str:
         """Extract date from table row"""
-        for value in row.values:
-            if value and isinstance(value, str):
-                date = self._extract_date(value)
-                if date != datetime.now().strftime('%Y-%m-%d'):  # Not default date
+        for value in row:
+            # Every date pattern needs digits, so skip cells like "Glucose"
+            if value and isinstance(value, str) and any(char.isdigit() for char in value):
+                date = self._try_parse_date(value)
+                if date:
                     return date
-        return datetime.now().strftime('%Y-%m-%d')
+        return default
     
     def _extract_patient_info(self, text: str) -> Dict[str, str]:
         """Extract patient information from text"""
         info = {}
         
         # Extract name
-        name_patterns = [
-            r'patient\s*(?:name)?:?\s*([a-zA-Z\s]+)',
-            r'name:?\s*([a-zA-Z\s]+)',
-            r'patient:?\s*([a-zA-Z\s]+)'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._name_compiled:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 if len(name) > 2 and not any(char.isdigit() for char in name):
@@ -503,14 +1012,8 @@ class AdvancedPDFParser:
                     break
         
         # Extract age
-        age_patterns = [
-            r'age:?\s*(\d+)',
-            r'(\d+)\s*years?\s*old',
-            r'(\d+)\s*yo'
-        ]
-        
-        for pattern in age_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._age_compiled:
+            match = pattern.search(text)
             if match:
                 age = int(match.group(1))
                 if 0 < age < 150:  # Reasonable age range
@@ -518,14 +1021,8 @@ class AdvancedPDFParser:
                     break
         
         # Extract gender
-        gender_patterns = [
-            r'gender:?\s*(male|female|m|f)',
-            r'sex:?\s*(male|female|m|f)',
-            r'\b(male|female)\b'
-        ]
-        
-        for pattern in gender_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self._gender_compiled:
+            match = pattern.search(text)
             if match:
                 gender = match.group(1).upper()
                 if gender in ['MALE', 'M']:
@@ -538,20 +1035,10 @@ class AdvancedPDFParser:
     
     def _extract_unit(self, text: str, biomarker: str) -> str:
         """Extract unit for biomarker from text"""
-        # Common units for different biomarkers
-        unit_patterns = {
-            'cholesterol': r'(mg/dl|mmol/l)',
-            'glucose': r'(mg/dl|mmol/l)',
-            'creatinine': r'(mg/dl|μmol/l|umol/l)',
-            'vitamin d': r'(ng/ml|nmol/l)',
-            'vitamin b12': r'(pg/ml|pmol/l)',
-            'hba1c': r'(%|mmol/mol)'
-        }
-        
         biomarker_lower = biomarker.lower()
-        for key, pattern in unit_patterns.items():
+        for key, pattern in self._unit_compiled.items():
             if key in biomarker_lower:
-                match = re.search(pattern, text, re.IGNORECASE)
+                match = pattern.search(text)
                 if match:
                     return match.group(1)
         
@@ -559,43 +1046,25 @@ class AdvancedPDFParser:
     
     def _extract_unit_from_cell(self, cell_value: str) -> str:
         """Extract unit from table cell"""
-        unit_match = re.search(r'(\w+/\w+|%)', cell_value)
+        unit_match = _UNIT_CELL_RE.search(cell_value)
         return unit_match.group(1) if unit_match else ''
     
     def _validate_biomarker_value(self, biomarker: str, value: float) -> bool:
         """Validate if biomarker value is reasonable"""
-        # Define reasonable ranges for validation
-        validation_ranges = {
-            'Total Cholesterol': (50, 1000),
-            'LDL': (20, 800),
-            'HDL': (10, 200),
-            'Triglycerides': (20, 2000),
-            'Glucose': (30, 800),
-            'HbA1c': (3.0, 20.0),
-            'Creatinine': (0.1, 20.0),
-            'Vitamin D': (1, 200),
-            'Vitamin B12': (50, 5000),
-            'TSH': (0.01, 100.0),
-            'Iron': (10, 500),
-            'Ferritin': (1, 5000)
-        }
-        
-        if biomarker in validation_ranges:
-            min_val, max_val = validation_ranges[biomarker]
-            return min_val <= value <= max_val
-        
-        return True  # Allow unknown biomarkers
+        # Unknown biomarkers are allowed through
+        return self._valid_lo.get(biomarker, -np.inf) <= value <= self._valid_hi.get(biomarker, np.inf)
     
     def _get_clinical_status(self, biomarker: str, value: float) -> str:
         """Get clinical status for biomarker value"""
-        if biomarker not in self.clinical_ranges:
+        if biomarker not in self._range_bounds:
             return 'Unknown'
         
-        ranges = self.clinical_ranges[biomarker]
-        
-        for status, (min_val, max_val) in ranges.items():
-            if min_val <= value <= max_val:
-                return status.title()
+        # First range whose upper bound is >= value; ranges sharing a boundary
+        # resolve to the lower one
+        upper_bounds, lower_bounds, labels = self._range_bounds[biomarker]
+        idx = bisect_left(upper_bounds, value)
+        if idx < len(labels) and lower_bounds[idx] <= value:
+            return labels[idx]
         
         return 'Out of range'
     
@@ -626,8 +1095,12 @@ class AdvancedPDFParser:
     def save_to_json(self, data: Dict[str, Any], output_path: str) -> None:
         """Save extracted data to JSON file"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            if orjson is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(data, default=str, option=_ORJSON_OPTIONS))
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
             logger.info(f"Data saved to {output_path}")
         except Exception as e:
             logger.error(f"Failed to save data to JSON: {e}")
@@ -638,26 +1111,30 @@ class AdvancedPDFParser:
         try:
             records = []
             metadata = data.get('metadata', {})
+            # Patient fields are the same on every row
+            patient = (
+                metadata.get('patient_name', ''),
+                metadata.get('patient_age', ''),
+                metadata.get('patient_gender', ''),
+                metadata.get('report_date', '')
+            )
             
             for biomarker, values in data.get('biomarkers', {}).items():
                 if isinstance(values, list):
                     for item in values:
-                        record = {
-                            'biomarker': biomarker,
-                            'date': item.get('date', ''),
-                            'value': item.get('value', ''),
-                            'unit': item.get('unit', ''),
-                            'status': item.get('status', ''),
-                            'patient_name': metadata.get('patient_name', ''),
-                            'patient_age': metadata.get('patient_age', ''),
-                            'patient_gender': metadata.get('patient_gender', ''),
-                            'report_date': metadata.get('report_date', '')
-                        }
-                        records.append(record)
+                        records.append((
+                            biomarker,
+                            item.get('date', ''),
+                            item.get('value', ''),
+                            item.get('unit', ''),
+                            item.get('status', ''),
+                            *patient
+                        ))
             
             if records:
-                df = pd.DataFrame(records)
-                df.to_csv(output_path, index=False)
+                df = pd.DataFrame.from_records(records, columns=_CSV_COLS)
+                df[_CSV_CATEGORY_COLS] = df[_CSV_CATEGORY_COLS].astype('category')
+                df.to_csv(output_path, index=False, lineterminator='\n')
                 logger.info(f"Data saved to CSV: {output_path}")
             else:
                 logger.warning("No data to save to CSV")
@@ -670,6 +1147,14 @@ class AdvancedPDFParser:
         """Generate trend analysis for biomarkers with multiple values"""
         trends = {}
         
+        series = [values for values in data.get('biomarkers', {}).values()
+                  if isinstance(values, list) and len(values) > 1]
+        self._trend_series_count += len(series)
+        if self._trend_series_count >= TREND_JIT_MIN_SERIES:
+            trend_kernel = _compiled_trend_kernel()
+        else:
+            trend_kernel = _trend_kernel
+
         for biomarker, values in data.get('biomarkers', {}).items():
             if isinstance(values, list) and len(values) > 1:
                 # Sort by date
@@ -680,23 +1165,13 @@ class AdvancedPDFParser:
                 numeric_values = [item['value'] for item in sorted_values]
                 
                 if len(numeric_values) >= 2:
-                    # Simple linear trend
-                    x = np.arange(len(numeric_values))
-                    coefficients = np.polyfit(x, numeric_values, 1)
-                    slope = coefficients[0]
-                    
-                    # Calculate percentage change
-                    first_value = numeric_values[0]
+                    slope, percent_change, direction_code = trend_kernel(
+                        np.asarray(numeric_values, dtype=np.float64)
+                    )
+                    slope = float(slope)
+                    percent_change = float(percent_change)
+                    trend_direction = _TREND_DIRECTIONS[direction_code]
                     last_value = numeric_values[-1]
-                    percent_change = ((last_value - first_value) / first_value) * 100 if first_value != 0 else 0
-                    
-                    # Determine trend direction
-                    if abs(slope) < 0.1:  # Minimal change threshold
-                        trend_direction = 'stable'
-                    elif slope > 0:
-                        trend_direction = 'increasing'
-                    else:
-                        trend_direction = 'decreasing'
                     
                     trends[biomarker] = {
                         'trend_direction': trend_direction,
@@ -710,157 +1185,126 @@ class AdvancedPDFParser:
         
         return trends
     
-    def generate_summary_report(self, data: Dict[str, Any]) -> str:
-        """Generate a human-readable summary report"""
-        report_lines = []
-        report_lines.append("=== HEALTH BIOMARKER ANALYSIS REPORT ===\n")
+    def generate_summary_report(self, data: Dict[str, Any],
+                                trends: Optional[Dict[str, Any]] = None,
+                                out: Optional[TextIO] = None) -> Optional[str]:
+        """Generate a human-readable summary report, reusing trends if already computed
+
+        Writes the report to out if given and returns None; otherwise returns it.
+        """
+        buf = out if out is not None else io.StringIO()
+        w = buf.write
+        w("=== HEALTH BIOMARKER ANALYSIS REPORT ===\n\n")
         
         # Metadata section
-        metadata = data.get('metadata', {})
+        metadata = data.get('metadata')
         if metadata:
-            report_lines.append("PATIENT INFORMATION:")
+            w("PATIENT INFORMATION:\n")
             if 'patient_name' in metadata:
-                report_lines.append(f"  Name: {metadata['patient_name']}")
+                w(f"  Name: {metadata['patient_name']}\n")
             if 'patient_age' in metadata:
-                report_lines.append(f"  Age: {metadata['patient_age']}")
+                w(f"  Age: {metadata['patient_age']}\n")
             if 'patient_gender' in metadata:
-                report_lines.append(f"  Gender: {metadata['patient_gender']}")
+                w(f"  Gender: {metadata['patient_gender']}\n")
             if 'report_date' in metadata:
-                report_lines.append(f"  Report Date: {metadata['report_date']}")
-            report_lines.append("")
+                w(f"  Report Date: {metadata['report_date']}\n")
+            w("\n")
         
-        # Biomarkers section
-        biomarkers = data.get('biomarkers', {})
+        # Biomarkers section; the item snapshot is shared with the recommendations
+        biomarkers = data.get('biomarkers')
+        biomarker_items = tuple(biomarkers.items()) if biomarkers else ()
         if biomarkers:
-            report_lines.append("BIOMARKER RESULTS:")
-            
-            # Group by category
-            categories = {
-                'Lipid Profile': ['Total Cholesterol', 'LDL', 'HDL', 'Triglycerides'],
-                'Diabetes Markers': ['Glucose', 'HbA1c'],
-                'Kidney Function': ['Creatinine', 'BUN', 'eGFR'],
-                'Vitamins': ['Vitamin D', 'Vitamin B12', 'Folate'],
-                'Thyroid Function': ['TSH', 'T3', 'T4'],
-                'Minerals': ['Calcium', 'Magnesium', 'Potassium', 'Sodium', 'Iron', 'Ferritin']
-            }
+            w("BIOMARKER RESULTS:\n")
             
-            for category, markers in categories.items():
-                category_markers = [m for m in markers if m in biomarkers]
-                if category_markers:
-                    report_lines.append(f"\n{category}:")
-                    for marker in category_markers:
+            # Group by category, skipping categories with none of their markers
+            biomarker_keys = biomarkers.keys()
+            for category, markers in _CATEGORY_ORDER:
+                if biomarker_keys.isdisjoint(markers):
+                    continue
+                w(f"\n{category}:\n")
+                for marker in markers:
+                    if marker in biomarker_keys:
                         values = biomarkers[marker]
                         if isinstance(values, list):
-                            latest = values[-1]  # Most recent value
-                            value_str = f"{latest['value']}"
-                            if latest.get('unit'):
-                                value_str += f" {latest['unit']}"
-                            
-                            status_indicator = ""
-                            status = latest.get('status', '').lower()
-                            if status in ['high', 'diabetic', 'deficient']:
-                                status_indicator = " ⚠️"
-                            elif status in ['normal', 'sufficient']:
-                                status_indicator = " ✓"
-                            
-                            report_lines.append(f"  {marker}: {value_str} ({latest.get('status', 'Unknown')}){status_indicator}")
+                            w(self._format_marker_line(marker, values[-1]))  # Most recent value
             
             # Add uncategorized biomarkers
-            uncategorized = []
-            all_categorized = []
-            for markers in categories.values():
-                all_categorized.extend(markers)
-            
-            for marker in biomarkers:
-                if marker not in all_categorized:
-                    uncategorized.append(marker)
+            uncategorized = [(marker, values) for marker, values in biomarker_items
+                             if marker not in _ALL_CATEGORIZED]
             
             if uncategorized:
-                report_lines.append(f"\nOther Markers:")
-                for marker in uncategorized:
-                    values = biomarkers[marker]
+                w("\nOther Markers:\n")
+                for marker, values in uncategorized:
                     if isinstance(values, list):
-                        latest = values[-1]
-                        value_str = f"{latest['value']}"
-                        if latest.get('unit'):
-                            value_str += f" {latest['unit']}"
-                        report_lines.append(f"  {marker}: {value_str} ({latest.get('status', 'Unknown')})")
+                        w(self._format_marker_line(marker, values[-1]))
         
         # Trend analysis
-        trends = self.generate_trend_analysis(data)
+        if trends is None and biomarkers:
+            trends = self.generate_trend_analysis(data)
         if trends:
-            report_lines.append(f"\nTREND ANALYSIS:")
+            w("\nTREND ANALYSIS:\n")
             for biomarker, trend_data in trends.items():
-                direction_emoji = {
-                    'increasing': '📈',
-                    'decreasing': '📉',
-                    'stable': '➡️'
-                }.get(trend_data['trend_direction'], '❓')
+                direction_emoji = _DIRECTION_EMOJI.get(trend_data['trend_direction'], '❓')
                 
-                report_lines.append(f"  {biomarker}: {trend_data['trend_direction'].title()} {direction_emoji}")
-                report_lines.append(f"    Change: {trend_data['percent_change']:+.1f}% over {trend_data['data_points']} readings")
+                w(f"  {biomarker}: {trend_data['trend_direction'].title()} {direction_emoji}\n")
+                w(f"    Change: {trend_data['percent_change']:+.1f}% over {trend_data['data_points']} readings\n")
         
         # Recommendations section
-        report_lines.append(f"\nRECOMMENDations:")
-        recommendations = self._generate_recommendations(data)
+        w("\nRECOMMENDations:\n")
+        recommendations = self._generate_recommendations_from_items(biomarker_items)
         for rec in recommendations:
-            report_lines.append(f"  • {rec}")
+            w(f"  • {rec}\n")
         
         if not recommendations:
-            report_lines.append("  • Consult with your healthcare provider for personalized recommendations")
+            w("  • Consult with your healthcare provider for personalized recommendations\n")
         
-        report_lines.append(f"\n{'='*50}")
-        report_lines.append("Note: This analysis is for informational purposes only.")
-        report_lines.append("Always consult with qualified healthcare professionals for medical advice.")
+        w(f"\n{'='*50}\n")
+        w("Note: This analysis is for informational purposes only.\n")
+        w("Always consult with qualified healthcare professionals for medical advice.")
         
-        return "\n".join(report_lines)
+        return None if out is not None else buf.getvalue()
+
+    @staticmethod
+    def _format_marker_line(marker: str, latest: Dict[str, Any]) -> str:
+        """Format one biomarker's latest reading as a report line"""
+        value = latest['value']
+        unit = latest.get('unit')
+        status = latest.get('status', 'Unknown')
+        value_str = f"{value} {unit}" if unit else f"{value}"
+        return _MARKER_FMT.format(marker=marker, value=value_str, status=status,
+                                  ind=_STATUS_INDICATOR.get(status.lower(), ""))
     
     def _generate_recommendations(self, data: Dict[str, Any]) -> List[str]:
         """Generate basic health recommendations based on biomarker values"""
+        return self._generate_recommendations_from_items(data.get('biomarkers', {}).items())
+
+    def _generate_recommendations_from_items(self, biomarker_items: Iterable[Tuple[str, Any]]) -> List[str]:
+        """Generate recommendations from (biomarker, values) pairs"""
         recommendations = []
-        biomarkers = data.get('biomarkers', {})
+        append = recommendations.append
         
-        # Check for common issues and generate recommendations
-        for biomarker, values in biomarkers.items():
+        # Check for common issues and generate recommendations, skipping duplicates
+        seen = set()
+        for biomarker, values in biomarker_items:
             if not isinstance(values, list) or not values:
                 continue
-                
-            latest = values[-1]
-            status = latest.get('status', '').lower()
-            value = latest.get('value', 0)
             
-            if biomarker == 'Total Cholesterol' and status == 'high':
-                recommendations.append("Consider dietary changes to reduce cholesterol intake")
-            elif biomarker == 'LDL' and status == 'high':
-                recommendations.append("Focus on reducing saturated fats and increasing fiber intake")
-            elif biomarker == 'HDL' and status == 'low':
-                recommendations.append("Increase physical activity to boost HDL cholesterol")
-            elif biomarker == 'Triglycerides' and status == 'high':
-                recommendations.append("Limit refined carbohydrates and added sugars")
-            elif biomarker in ['Glucose', 'HbA1c'] and status in ['prediabetic', 'diabetic']:
-                recommendations.append("Monitor blood sugar levels and consider diabetes management strategies")
-            elif biomarker == 'Vitamin D' and status in ['deficient', 'insufficient']:
-                recommendations.append("Consider vitamin D supplementation and increased sun exposure")
-            elif biomarker == 'Vitamin B12' and status == 'deficient':
-                recommendations.append("Consider vitamin B12 supplementation or B12-rich foods")
-            elif biomarker == 'Creatinine' and status == 'high':
-                recommendations.append("Stay well-hydrated and monitor kidney function")
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_recommendations = []
-        for rec in recommendations:
-            if rec not in seen:
-                unique_recommendations.append(rec)
+            status = values[-1].get('status', '').lower()
+            rec = _RECO_TABLE.get((biomarker, status))
+            if rec and rec not in seen:
                 seen.add(rec)
+                append(rec)
+                if len(recommendations) == 5:  # Limit to 5 recommendations
+                    break
         
-        return unique_recommendations[:5]  # Limit to 5 recommendations
+        return recommendations
     
     def _load_config(self, config_file: str) -> None:
         """Load configuration from JSON file"""
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            with open(config_file, 'rb') as f:
+                raw = f.read()
+            config = orjson.loads(raw) if orjson is not None else json.loads(raw)
             
             # Update patterns if provided
             if 'biomarker_patterns' in config:
@@ -880,6 +1324,86 @@ class AdvancedPDFParser:
             logger.warning(f"Failed to load configuration: {e}")
 
 
+def _trend_kernel(values: np.ndarray) -> Tuple[float, float, int]:
+    """Return (slope, percent change, index into _TREND_DIRECTIONS) for a value series"""
+    # Simple linear trend: least-squares slope over evenly spaced points
+    n = values.shape[0]
+    dx = np.arange(n) - (n - 1) / 2.0
+    slope = (dx * (values - values.mean())).sum() / (dx * dx).sum()
+
+    # Calculate percentage change
+    first_value = values[0]
+    last_value = values[n - 1]
+    percent_change = ((last_value - first_value) / first_value) * 100.0 if first_value != 0 else 0.0
+
+    # Determine trend direction
+    if abs(slope) < 0.1:  # Minimal change threshold
+        direction = 0
+    elif slope > 0:
+        direction = 1
+    else:
+        direction = 2
+    return slope, percent_change, direction
+
+
+_jit_trend_kernel = None
+
+
+def _compiled_trend_kernel():
+    """Return _trend_kernel compiled with numba, or as is when numba is unavailable"""
+    global _jit_trend_kernel
+    if _jit_trend_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _jit_trend_kernel = _trend_kernel
+        else:
+            # The on-disk cache spares later batch runs the compile
+            _jit_trend_kernel = njit(cache=True)(_trend_kernel)
+    return _jit_trend_kernel
+
+
+def _ocr_one_page(image: Image.Image, ocr_config: str) -> str:
+    """Preprocess and OCR a single page image (runs in a worker process)"""
+    import pytesseract
+    processed_image = AdvancedPDFParser._preprocess_image_for_ocr(image)
+    return pytesseract.image_to_string(processed_image, config=ocr_config)
+
+
+def _ocr_page_batch(images: Sequence[Image.Image], ocr_config: str) -> List[str]:
+    """OCR several page images with a single tesseract run (runs in a worker process)
+
+    Tesseract accepts a text file listing image paths and separates the pages
+    of its output with form feeds. Falls back to one call per page if the
+    batch run fails or its output doesn't split into one text per image.
+    """
+    if len(images) < 2:
+        return [_ocr_one_page(image, ocr_config) for image in images]
+
+    import pytesseract
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image_paths = []
+            for i, image in enumerate(images):
+                image_path = os.path.join(tmp_dir, f"page-{i}.png")
+                AdvancedPDFParser._preprocess_image_for_ocr(image).save(image_path)
+                image_paths.append(image_path)
+            list_path = os.path.join(tmp_dir, 'pages.txt')
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(image_paths) + "\n")
+
+            result = subprocess.run(
+                [pytesseract.pytesseract.tesseract_cmd, list_path, 'stdout', *shlex.split(ocr_config)],
+                capture_output=True, check=True
+            )
+        texts = result.stdout.decode('utf-8', errors='replace').split('\f')
+        if len(texts) >= len(images):
+            return [text + '\f' for text in texts[:len(images)]]
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return [_ocr_one_page(image, ocr_config) for image in images]
+
+
 def main():
     """Main function for command-line usage"""
     parser = argparse.ArgumentParser(description='Advanced PDF Parser for Health Reports')
@@ -915,28 +1439,51 @@ def main():
         else:
             print(f"Successfully extracted {len(extracted_data['biomarkers'])} biomarkers")
         
-        # Save to JSON
-        parser_instance.save_to_json(extracted_data, args.output)
+        # Trends go into the JSON output and the report, so compute them once
+        trends = parser_instance.generate_trend_analysis(extracted_data)
+
+        # Sibling output paths share the JSON file's stem
+        output_path = Path(args.output)
+        csv_path = output_path.with_suffix('.csv')
+        report_path = output_path.with_name(output_path.stem + '_report.txt')
+
+        report = None
+
+        def write_report():
+            # Encode once and write the bytes in one call rather than per line
+            nonlocal report
+            report = parser_instance.generate_summary_report(extracted_data, trends)
+            with open(report_path, 'wb') as f:
+                f.write(report.encode('utf-8'))
         
-        # Save to CSV if requested
+        # Output writers in the order they ran sequentially, with their target files
+        writers = [(output_path, lambda: parser_instance.save_to_json(
+            {**extracted_data, 'trends': trends}, args.output))]
         if args.csv:
-            csv_path = args.output.replace('.json', '.csv')
-            parser_instance.save_to_csv(extracted_data, csv_path)
+            writers.append((csv_path, lambda: parser_instance.save_to_csv(extracted_data, csv_path)))
+        if args.report:
+            writers.append((report_path, write_report))
+
+        # Distinct outputs are independent, so write them concurrently; if two share a
+        # file, write in order so the last one deterministically wins
+        if len({path.resolve() for path, _ in writers}) == len(writers):
+            with ThreadPoolExecutor(max_workers=len(writers)) as executor:
+                futures = [executor.submit(write) for _, write in writers]
+                for future in futures:
+                    future.result()
+        else:
+            for _, write in writers:
+                write()
         
-        # Generate report if requested
         if args.report:
-            report = parser_instance.generate_summary_report(extracted_data)
-            report_path = args.output.replace('.json', '_report.txt')
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(report)
             print(f"Summary report saved to: {report_path}")
             
             # Also print to console
-            print("\n" + "="*50)
-            print(report)
+            sys.stdout.write("\n" + "="*50 + "\n")
+            sys.stdout.write(report)
+            sys.stdout.write("\n")
         
-        print(f"\nExtraction completed successfully!")
-        print(f"Output saved to: {args.output}")
+        sys.stdout.write(f"\nExtraction completed successfully!\nOutput saved to: {args.output}\n")
         
     except Exception as e:
         logger.error(f"Error during PDF parsing: {e}")